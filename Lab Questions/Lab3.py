@@ -1,56 +1,206 @@
 import html
+import json
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
 import streamlit as st
+import streamlit.components.v1 as components
+
+# Optional: Numba-compiled step kernel (falls back to pure Python without it)
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
 
 # ------------------------------
 # 1) Algorithm (ported as-is)
 # ------------------------------
-def naive_search_steps(text, pattern):
+# Steps are packed into a single int instead of a dict or tuple:
+#   bits 0-1   match code: 0 about to compare, 1 mismatch, 2 full match
+#   bits 2-31  pattern_idx (patterns up to 2**30 chars)
+#   bits 32-   shift (up to 2**31 in the int64 Numba kernel)
+# text_idx is not stored: it is always shift + pattern_idx.
+# A full match implies found == (shift,).
+MATCH_CODES = (None, False, True)
+SHIFT_POS = 32
+PATTERN_MASK = (1 << (SHIFT_POS - 2)) - 1
+
+# Decoded step, as read by render_visual/status_text:
+#   match: None (about to compare), False (mismatch), True (full match)
+#   found: () or (i,)
+Step = namedtuple("Step", "text_idx pattern_idx shift match found")
+
+
+def pack_step(pattern_idx, shift, code):
+    return code | (pattern_idx << 2) | (shift << SHIFT_POS)
+
+
+def unpack_step(p):
+    """Expand a packed step into a Step."""
+    code = p & 3
+    shift = p >> SHIFT_POS
+    pattern_idx = (p >> 2) & PATTERN_MASK
+    return Step(shift + pattern_idx, pattern_idx, shift,
+                MATCH_CODES[code], (shift,) if code == 2 else ())
+
+
+def _step_templates(m):
+    """
+    Packed "about to compare pattern[j]" step for shift 0, one per j.
+    The fields do not overlap, so the step at shift i is
+    pre[j] + pack_step(0, i, 0), and adding 1 / 2 sets the match code.
     """
-    Build the same sequence of steps as the Tkinter generator, but as a list.
-    Each step is a dict:
+    return [pack_step(j, 0, 0) for j in range(m)]
+
+
+def naive_search_iter(text, pattern):
+    """
+    Yield the same sequence of steps as the Tkinter generator, lazily.
+    Each step is packed with pack_step:
       - text_idx
       - pattern_idx
       - shift
-      - match: None (about to compare), False (mismatch), True (full match)
-      - found_indices: [] or [i]
+      - match code: 0 (about to compare), 1 (mismatch), 2 (full match)
     """
     n = len(text)
     m = len(pattern)
-    steps = []
 
     if m == 0 or n < m:
-        return steps
+        return
+
+    # ASCII fast path: indexing bytes gives ints, so each comparison is int == int
+    # instead of building and comparing 1-char str objects
+    if text.isascii() and pattern.isascii():
+        text = text.encode("ascii")
+        pattern = pattern.encode("ascii")
 
+    pre = _step_templates(m)
+    # Next shift with a full match, located by the C-level find
+    hit = text.find(pattern)
     for i in range(n - m + 1):
-        for j in range(m):
+        base = pack_step(0, i, 0)
+        if i == hit:
+            # Every comparison succeeds, so emit them without comparing
+            for j in range(m):
+                yield pre[j] + base
+            # Full match
+            yield pre[m - 1] + base + 2
+            hit = text.find(pattern, i + 1)
+            continue
+        # Not a full match, so this walk always stops at a mismatch before j == m
+        j = 0
+        while text[i + j] == pattern[j]:
             # Before comparison
-            steps.append({
-                'text_idx': i + j,
-                'pattern_idx': j,
-                'shift': i,
-                'match': None,
-                'found_indices': []
-            })
+            yield pre[j] + base
+            j += 1
+        step = pre[j] + base
+        yield step
+        # Mismatch
+        yield step + 1
+
+
+def bmh_search_iter(text, pattern):
+    """
+    Boyer-Moore-Horspool variant of naive_search_iter.
+
+    The window is compared right-to-left; after a mismatch (or a full match)
+    the pattern jumps ahead using the bad-character skip table keyed on the
+    text character under the last pattern position. Steps use the same
+    packed encoding, so render_visual works unchanged.
+    """
+    n = len(text)
+    m = len(pattern)
+
+    if m == 0 or n < m:
+        return
+
+    skip = {c: m - 1 - i for i, c in enumerate(pattern[:-1])}
+
+    pre = _step_templates(m)
+    i = 0
+    while i <= n - m:
+        base = pack_step(0, i, 0)
+        for j in range(m - 1, -1, -1):
+            # Before comparison
+            step = pre[j] + base
+            yield step
             if text[i + j] != pattern[j]:
                 # Mismatch
-                steps.append({
-                    'text_idx': i + j,
-                    'pattern_idx': j,
-                    'shift': i,
-                    'match': False,
-                    'found_indices': []
-                })
+                yield step + 1
                 break
         else:
             # Full match
-            steps.append({
-                'text_idx': i + m - 1,
-                'pattern_idx': m - 1,
-                'shift': i,
-                'match': True,
-                'found_indices': [i]
-            })
-    return steps
+            yield base + 2
+        i += skip.get(text[i + m - 1], m)
+
+
+if numba is not None:
+    @numba.njit(cache=True, nogil=True)
+    def _naive_kernel(t, p):
+        n = t.shape[0]
+        m = p.shape[0]
+        # Counting pass: first mismatching j per shift (m for a full match),
+        # so the output is sized exactly instead of for the all-match worst case
+        stop = np.empty(n - m + 1, dtype=np.int32)
+        size = 0
+        for i in range(n - m + 1):
+            j = 0
+            while j < m and t[i + j] == p[j]:
+                j += 1
+            stop[i] = j
+            size += j + 1 if j == m else j + 2  # compares + match, or compares + mismatch
+        steps = np.empty(size, dtype=np.int64)
+        k = 0
+        for i in range(n - m + 1):
+            last = stop[i]
+            for j in range(min(last + 1, m)):
+                # Before comparison
+                steps[k] = (j << 2) | (i << SHIFT_POS)
+                k += 1
+            if last < m:
+                # Mismatch
+                steps[k] = 1 | (last << 2) | (i << SHIFT_POS)
+            else:
+                # Full match
+                steps[k] = 2 | ((m - 1) << 2) | (i << SHIFT_POS)
+            k += 1
+        return steps
+
+
+def _encode(s):
+    if s.isascii():
+        return np.frombuffer(s.encode("ascii"), dtype=np.uint8)
+    return np.array([ord(c) for c in s], dtype=np.int32)
+
+
+def naive_search_packed(text, pattern):
+    """
+    Run the naive search in the Numba kernel.
+    Returns an int64 array of packed steps (see pack_step).
+    """
+    return _naive_kernel(_encode(text), _encode(pattern))
+
+
+def naive_search_array_iter(text, pattern):
+    """
+    Same steps as naive_search_iter, produced by the Numba kernel.
+    The kernel runs right away (so it can be done in a worker thread);
+    only the conversion to Python ints is lazy.
+    """
+    if len(pattern) == 0 or len(text) < len(pattern):
+        return iter(())
+    steps = naive_search_packed(text, pattern)
+    return (int(p) for p in steps)
+
+
+SEARCH_ALGORITHMS = {
+    "Naive": naive_search_iter if numba is None else naive_search_array_iter,
+    "Boyer-Moore-Horspool": bmh_search_iter,
+}
+
+# Producers that do their work when called (not on next()), so they run in a worker thread
+EAGER_PRODUCERS = {naive_search_array_iter}
 
 
 # ------------------------------
@@ -59,18 +209,62 @@ def naive_search_steps(text, pattern):
 def init_state():
     st.session_state.setdefault("text", "AABAACAADAABAABA")
     st.session_state.setdefault("pattern", "AABA")
-    st.session_state.setdefault("steps", [])
-    st.session_state.setdefault("step_idx", None)   # None -> not started; -1 -> initial layout; >=0 -> in steps
+    # per-character HTML escapes, refreshed only when the inputs change
+    st.session_state.setdefault("text_escaped", escape_chars(st.session_state.text))
+    st.session_state.setdefault("pattern_escaped", escape_chars(st.session_state.pattern))
+    st.session_state.setdefault("future", None)     # pending step preparation
+    st.session_state.setdefault("gen", None)
+    st.session_state.setdefault("step_packed", None)  # current step (see pack_step)
+    st.session_state.setdefault("step_idx", None)   # None -> not started; -1 -> initial layout; >=0 -> steps produced
     st.session_state.setdefault("found_indices", [])
     st.session_state.setdefault("started", False)
     st.session_state.setdefault("complete", False)
+    st.session_state.setdefault("player_html", None)  # built once per search in browser mode
 
 def reset_state():
-    st.session_state["steps"] = []
+    st.session_state["future"] = None
+    st.session_state["gen"] = None
+    st.session_state["step_packed"] = None
     st.session_state["step_idx"] = None
     st.session_state["found_indices"] = []
     st.session_state["started"] = False
     st.session_state["complete"] = False
+    st.session_state["player_html"] = None
+
+def set_inputs(text, pattern):
+    """Store new inputs with their escapes (always from the same strings) and drop any search."""
+    st.session_state.text = text
+    st.session_state.pattern = pattern
+    st.session_state.text_escaped = escape_chars(text)
+    st.session_state.pattern_escaped = escape_chars(pattern)
+    reset_state()
+
+def executor():
+    if "executor" not in st.session_state:
+        st.session_state["executor"] = ThreadPoolExecutor(max_workers=1)
+    return st.session_state["executor"]
+
+def poll_steps(timeout=0.0):
+    """Pick up the step iterator once the background preparation is done."""
+    fut = st.session_state.future
+    if fut is None:
+        return
+    try:
+        st.session_state.gen = fut.result(timeout=timeout)
+    except FuturesTimeout:
+        return
+    except Exception as exc:
+        # e.g. MemoryError from the kernel; drop the search so later reruns (and Reset) still work.
+        # Kept in state so the message survives the rerun that follows.
+        reset_state()
+        st.session_state["step_error"] = f"Could not prepare the search steps: {exc!r}"
+        return
+    st.session_state.future = None
+
+def shown_step():
+    """The step being shown, or None for the initial layout / before Start."""
+    packed = st.session_state.step_packed
+    return None if packed is None else unpack_step(packed)
 
 
 # ------------------------------
@@ -132,9 +326,82 @@ CSS = """
 </style>
 """
 
-def render_visual(text, pattern, step, found_indices_so_far):
+def _pattern_label_row(m, n, shift):
+    # Row 1: Pattern index labels (shifted)
+    return "".join(
+        f'<div class="label" style="grid-row:1;grid-column:{shift + i + 1}">{i}</div>'
+        for i in range(m) if shift + i < n
+    )
+
+
+# Cell class codes -> CSS classes
+CHAR_CLASSES = ("char", "char comparing", "char mismatch", "char found", "char match")
+# Step match status (None / False / True) -> class code of the highlighted cells
+STATUS_CODES = {None: 1, False: 2, True: 4}
+# Binary digits of the found bitmask -> class codes (0 default, 3 found)
+_FOUND_CODES = bytes.maketrans(b"01", b"\x00\x03")
+
+
+def _pattern_row(esc_pattern, n, shift, match_status, pattern_idx):
+    # Row 2: Pattern boxes
+    m = len(esc_pattern)
+    codes = bytearray(m)
+    if match_status is True:
+        codes[:] = b"\x04" * m
+    elif pattern_idx is not None:
+        codes[pattern_idx] = STATUS_CODES[match_status]
+    return "".join(
+        f'<div class="{CHAR_CLASSES[codes[i]]}" '
+        f'style="grid-row:2;grid-column:{shift + i + 1}">{ch}</div>'
+        for i, ch in enumerate(esc_pattern) if shift + i < n
+    )
+
+
+@st.cache_data(max_entries=8)
+def _render_text_row(text, found_mask):
+    # Row 3: Text boxes with only the previously found segments (blue).
+    # Independent of the current step, so it is reused across consecutive steps.
+    # Keyed on the raw str (one cheap hash); st.cache_data hashes a per-char
+    # tuple element by element, which costs more than rebuilding the row.
+    codes = bytearray(len(text))
+    bits = bin(found_mask)[:1:-1]  # bit i of the mask -> bits[i]
+    codes[:len(bits)] = bits.encode("ascii").translate(_FOUND_CODES)
+    return "".join(
+        f'<div class="{CHAR_CLASSES[codes[i]]}" '
+        f'style="grid-row:3;grid-column:{i + 1}">{html.escape(ch)}</div>'
+        for i, ch in enumerate(text)
+    )
+
+
+def _text_overlay(esc_text, m, match_status, text_idx, shift):
+    # Current step highlight, placed in the same grid cells after row 3 so it is drawn on top
+    # the *current* match is green, even over previously found matches
+    cls = CHAR_CLASSES[STATUS_CODES[match_status]]
+    cells = range(shift, shift + m) if match_status is True else (text_idx,)
+    return "".join(
+        f'<div class="{cls}" style="grid-row:3;grid-column:{i + 1}">{esc_text[i]}</div>'
+        for i in cells
+    )
+
+
+@st.cache_data(max_entries=8)
+def _render_index_row(n):
+    # Row 4: Text index labels
+    return "".join(
+        f'<div class="label" style="grid-row:4;grid-column:{i + 1}">{i}</div>'
+        for i in range(n)
+    )
+
+
+def escape_chars(s):
+    """HTML-escape each character of s (escaping may expand a char, e.g. & -> &amp;)."""
+    return tuple(html.escape(ch) for ch in s)
+
+
+def render_visual(text, esc_text, esc_pattern, step, found_indices_so_far):
     """
     Build an HTML grid similar to the Tkinter canvas visualization.
+    Text and pattern also come pre-escaped per character (see escape_chars).
 
     Rows:
       1) Pattern indices
@@ -142,8 +409,8 @@ def render_visual(text, pattern, step, found_indices_so_far):
       3) Text boxes
       4) Text indices
     """
-    n = len(text)
-    m = len(pattern)
+    n = len(esc_text)
+    m = len(esc_pattern)
 
     # Determine current step details
     if step is None:
@@ -151,116 +418,218 @@ def render_visual(text, pattern, step, found_indices_so_far):
         match_status = None
         text_idx = None
         pattern_idx = None
-        step_found = []
     else:
-        shift = step["shift"]
-        match_status = step["match"]
-        text_idx = step["text_idx"]
-        pattern_idx = step["pattern_idx"]
-        step_found = step["found_indices"][:]  # [] or [i]
-
-    # Build sets for quick highlighting of previously found segments
-    previously_found_positions = set()
+        shift = step.shift
+        match_status = step.match
+        text_idx = step.text_idx
+        pattern_idx = step.pattern_idx
+
+    # Bit i set -> text[i] belongs to a previously found segment
+    found_mask = 0
+    span = (1 << m) - 1
     for fi in found_indices_so_far:
-        for k in range(m):
-            previously_found_positions.add(fi + k)
-
-    # If the current step is a "full match", we want the *current* match to be green,
-    # even if previously found matches exist.
-    current_match_positions = set()
-    if match_status is True and step_found:
-        fi = step_found[0]
-        for k in range(m):
-            current_match_positions.add(fi + k)
-
-    # HTML begin
-    grid_cols = n
-    html_parts = []
-    html_parts.append('<div class="wrapper">')
-    html_parts.append(f'<div class="grid" style="grid-template-columns: repeat({grid_cols}, var(--box-size));">')
-
-    # Row 1: Pattern index labels (shifted)
-    for i in range(m):
-        col = shift + i + 1
-        if 1 <= col <= n:
-            html_parts.append(f'<div class="label" style="grid-row:1; grid-column:{col};">{i}</div>')
-
-    # Row 2: Pattern boxes
-    for i, ch in enumerate(pattern):
-        col = shift + i + 1
-        if not (1 <= col <= n):
-            continue
-        classes = ["char"]
-        if match_status is None and i == pattern_idx:
-            classes.append("comparing")
-        elif match_status is False and i == pattern_idx:
-            classes.append("mismatch")
-        elif match_status is True:
-            classes.append("match")
-        safe_ch = html.escape(ch)
-        html_parts.append(
-            f'<div class="{" ".join(classes)}" style="grid-row:2; grid-column:{col};">{safe_ch}</div>'
-        )
-
-    # Row 3: Text boxes
-    for i, ch in enumerate(text):
-        classes = ["char"]
-        # Previously found (blue), unless current step is marking a new full match at this position (green)
-        if i in previously_found_positions:
-            classes.append("found")
-        # Override with current step highlight if applicable
-        if match_status is None and i == text_idx:
-            classes = ["char", "comparing"]
-        elif match_status is False and i == text_idx:
-            classes = ["char", "mismatch"]
-        elif match_status is True and i in current_match_positions:
-            classes = ["char", "match"]
-
-        safe_ch = html.escape(ch)
-        html_parts.append(
-            f'<div class="{" ".join(classes)}" style="grid-row:3; grid-column:{i+1};">{safe_ch}</div>'
-        )
-
-    # Row 4: Text index labels
-    for i in range(n):
-        html_parts.append(f'<div class="label" style="grid-row:4; grid-column:{i+1};">{i}</div>')
+        found_mask |= span << fi
 
-    html_parts.append('</div></div>')  # grid + wrapper
-    return "\n".join(html_parts)
+    return "".join((
+        '<div class="wrapper">',
+        f'<div class="grid" style="grid-template-columns:repeat({n},var(--box-size))">',
+        _pattern_label_row(m, n, shift),
+        _pattern_row(esc_pattern, n, shift, match_status, pattern_idx),
+        _render_text_row(text, found_mask),
+        _text_overlay(esc_text, m, match_status, text_idx, shift) if step is not None else "",
+        _render_index_row(n),
+        '</div></div>',  # grid + wrapper
+    ))
 
 
 def status_text(step, found_indices, pattern_len):
     if step is None:
         return "Ready. Press 'Next Step' to begin comparison."
-    shift = step["shift"]
-    t = step["text_idx"]
-    p = step["pattern_idx"]
-    m = step["match"]
+    shift = step.shift
+    t = step.text_idx
+    p = step.pattern_idx
+    m = step.match
     if m is None:
         return f"Shifting pattern by {shift}. Comparing pattern[{p}] with text[{t}]."
     elif m is False:
         return f"Mismatch at text[{t}] and pattern[{p}]. Shifting pattern."
     else:
-        idx = step["found_indices"][0]
+        idx = step.found[0]
         return f"Pattern found at index {idx}! Press 'Next Step' to continue search."
 
 
+# ------------------------------
+# 3b) In-browser playback
+# ------------------------------
+# Steps are re-packed for JavaScript as (shift * M + pattern_idx) * 4 + code,
+# which stays below 2**53 (so JSON numbers round-trip exactly) for any
+# realistic n * m, and decodes with plain arithmetic instead of 32-bit
+# bitwise operators.
+PLAYER_JS = """
+const $ = id => document.getElementById(id);
+const status = $("status"), nextBtn = $("next");
+const N = TEXT.length, M = PATTERN.length;
+let k = 0, lit = [], found = [], foundAt = [];
+
+// Initial layout: clone the cell template instead of shipping every <div>
+function build() {
+  const grid = $("grid"), cell = $("cell").content.firstElementChild;
+  const add = (id, cls, row, col, content) => {
+    const el = cell.cloneNode();
+    el.id = id;
+    el.className = cls;
+    el.style.gridRow = row;
+    el.style.gridColumn = col;
+    el.textContent = content;
+    grid.appendChild(el);
+  };
+  grid.style.gridTemplateColumns = `repeat(${N}, var(--box-size))`;
+  for (let i = 0; i < M; i++) {
+    add("pl" + i, "label", 1, i + 1, i);
+    add("p" + i, "char", 2, i + 1, PATTERN[i]);
+  }
+  for (let i = 0; i < N; i++) {
+    add("t" + i, "char", 3, i + 1, TEXT[i]);
+    add("tl" + i, "label", 4, i + 1, i);
+  }
+}
+
+function place(shift) {
+  for (let i = 0; i < M; i++) {
+    const col = shift + i + 1;
+    for (const id of ["pl" + i, "p" + i]) {
+      $(id).style.gridColumn = col;
+      $(id).style.display = col <= N ? "" : "none";
+    }
+  }
+}
+
+function clear() {
+  for (const i of lit) $("t" + i).className = found[i] ? "char found" : "char";
+  lit = [];
+  for (let i = 0; i < M; i++) $("p" + i).className = "char";
+}
+
+function apply(s) {
+  const q = Math.floor(s / 4), code = s % 4, j = q % M, shift = Math.floor(q / M);
+  clear();
+  place(shift);
+  if (code === 2) {
+    // Full match: current match green, remembered as found (blue) afterwards
+    foundAt.push(shift);
+    for (let i = shift; i < shift + M; i++) {
+      found[i] = true;
+      $("t" + i).className = "char match";
+      lit.push(i);
+    }
+    for (let i = 0; i < M; i++) $("p" + i).className = "char match";
+    status.textContent = `Pattern found at index ${shift}! Press 'Next Step' to continue search.`;
+  } else {
+    const cls = code === 0 ? "char comparing" : "char mismatch";
+    $("t" + (shift + j)).className = cls;
+    lit.push(shift + j);
+    $("p" + j).className = cls;
+    status.textContent = code === 0
+      ? `Shifting pattern by ${shift}. Comparing pattern[${j}] with text[${shift + j}].`
+      : `Mismatch at text[${shift + j}] and pattern[${j}]. Shifting pattern.`;
+  }
+}
+
+function step() {
+  if (k < STEPS.length) {
+    apply(STEPS[k++]);
+    return;
+  }
+  nextBtn.disabled = true;
+  status.textContent = foundAt.length
+    ? `Search complete. Pattern found at indices: [${foundAt.join(", ")}]`
+    : "Search complete. Pattern not found.";
+}
+
+build();
+nextBtn.addEventListener("click", step);
+"""
+
+PLAYER_CSS = """
+<style>
+body { margin: 0; font-family: sans-serif; }
+.wrapper { overflow-x: auto; }
+.controls { display: flex; gap: 12px; align-items: center; margin-top: 10px; }
+#status { font-size: 14px; color: #555; }
+</style>
+"""
+
+
+def _js_literal(value):
+    # JSON is valid JS. Escape <, > and & as \u003c-style escapes (same string value) so
+    # user text such as "</script>" or "<!--<script>" cannot change how the
+    # HTML tokenizer ends the <script> element.
+    return (json.dumps(value, separators=(",", ":"))
+            .replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026"))
+
+
+def render_initial_skeleton(text, pattern, steps):
+    """
+    Build a self-contained page for st.components.v1.html. Only the text,
+    pattern and steps are sent; the browser clones a cell <template> to lay
+    out the grid (initial layout, as render_visual with step=None) and
+    applies every later step by swapping classes on the cells.
+    """
+    m = len(pattern)
+    js_steps = [((p >> SHIFT_POS) * m + ((p >> 2) & PATTERN_MASK)) * 4 + (p & 3) for p in steps]
+    return "".join((
+        CSS,
+        PLAYER_CSS,
+        '<template id="cell"><div></div></template>',
+        '<div class="wrapper"><div id="grid" class="grid"></div></div>',
+        '<div class="controls"><button id="next">Next Step</button>',
+        '<span id="status">Ready. Press \'Next Step\' to begin comparison.</span></div>',
+        # Array.from splits by code point, matching Python's indexing
+        f'<script>const TEXT = Array.from({_js_literal(text)}), PATTERN = Array.from({_js_literal(pattern)});',
+        f'const STEPS = {_js_literal(js_steps)};',
+        PLAYER_JS,
+        '</script>',
+    ))
+
+
 # ------------------------------
 # 4) UI
 # ------------------------------
+LEGEND_HTML = """
+<div class="legend">
+  <span><i class="dot dot-default"></i> Default</span>
+  <span><i class="dot dot-compare"></i> Comparing</span>
+  <span><i class="dot dot-mismatch"></i> Mismatch</span>
+  <span><i class="dot dot-match"></i> Current Full Match</span>
+  <span><i class="dot dot-found"></i> Previously Found</span>
+</div>
+"""
+
 st.set_page_config(page_title="Naive String Search Visualizer", page_icon="🔎", layout="wide")
 init_state()
+poll_steps()
 st.markdown(CSS, unsafe_allow_html=True)
 
 st.title("Naive String Search Visualizer")
+if "step_error" in st.session_state:
+    st.error(st.session_state.pop("step_error"))
 
 # Inputs
 with st.container():
     c1, c2 = st.columns([2, 1])
     with c1:
-        st.session_state.text = st.text_input("Text", value=st.session_state.text, key="text_input")
+        new_text = st.text_input("Text", value=st.session_state.text, key="text_input")
     with c2:
-        st.session_state.pattern = st.text_input("Pattern", value=st.session_state.pattern, key="pattern_input")
+        new_pattern = st.text_input("Pattern", value=st.session_state.pattern, key="pattern_input")
+    # Only write back on an actual edit; a running search no longer matches the inputs, so drop it
+    if new_text != st.session_state.text or new_pattern != st.session_state.pattern:
+        set_inputs(new_text, new_pattern)
+    # Switching algorithms mid-search would keep stepping the old generator, so start over
+    algorithm = st.radio("Algorithm", list(SEARCH_ALGORITHMS), horizontal=True,
+                         key="algorithm", on_change=reset_state)
+    # Switching modes mid-search would hand the player a partly consumed generator, so start over
+    browser_mode = st.checkbox("Step through in the browser (no server round-trip per step)",
+                               key="browser_mode", on_change=reset_state)
 
 # Controls
 col_start, col_next, col_reset = st.columns([1, 1, 1])
@@ -274,34 +643,45 @@ with col_start:
         elif len(pattern) > len(text):
             st.error("Pattern cannot be longer than the text.")
         else:
-            st.session_state.steps = naive_search_steps(text, pattern)
+            producer = SEARCH_ALGORITHMS[algorithm]
+            if producer in EAGER_PRODUCERS:
+                # Prepare steps off the script thread so the initial layout paints immediately
+                st.session_state.future = executor().submit(producer, text, pattern)
+                st.session_state.gen = None
+            else:
+                # Plain generators do no work until next(), so there is nothing to offload
+                st.session_state.future = None
+                st.session_state.gen = producer(text, pattern)
+            st.session_state.player_html = None
+            st.session_state.step_packed = None
             st.session_state.found_indices = []
             st.session_state.step_idx = -1  # show initial layout first
             st.session_state.started = True
             st.session_state.complete = False
 
 with col_next:
-    disabled_next = not st.session_state.started or st.session_state.complete
+    disabled_next = (not st.session_state.started or st.session_state.complete
+                     or st.session_state.future is not None or browser_mode)
     if st.button("Next Step", use_container_width=True, disabled=disabled_next):
         if st.session_state.step_idx is None:
             # not started
             pass
         else:
             # move from initial (-1) to first step, or advance
-            if st.session_state.step_idx < len(st.session_state.steps) - 1:
-                st.session_state.step_idx += 1
-                step = st.session_state.steps[st.session_state.step_idx]
-                if step["match"] is True and step["found_indices"]:
-                    st.session_state.found_indices.extend(step["found_indices"])
-            else:
+            try:
+                step = next(st.session_state.gen)
+            except StopIteration:
                 st.session_state.complete = True
+            else:
+                st.session_state.step_packed = step
+                st.session_state.step_idx += 1
+                if (step & 3) == 2:  # full match at this shift
+                    st.session_state.found_indices.append(step >> SHIFT_POS)
 
 with col_reset:
     if st.button("Reset", use_container_width=True):
-        reset_state()
         # keep convenient defaults
-        st.session_state.text = "AABAACAADAABAABA"
-        st.session_state.pattern = "AABA"
+        set_inputs("AABAACAADAABAABA", "AABA")
 
 st.divider()
 
@@ -309,45 +689,43 @@ st.divider()
 text = st.session_state.text_input if "text_input" in st.session_state else st.session_state.text
 pattern = st.session_state.pattern_input if "pattern_input" in st.session_state else st.session_state.pattern
 
-current_step = None
-if st.session_state.started:
-    if st.session_state.step_idx == -1:
-        current_step = None  # initial layout
-    elif 0 <= st.session_state.step_idx < len(st.session_state.steps):
-        current_step = st.session_state.steps[st.session_state.step_idx]
+# None before Start and for the initial layout (step_idx == -1)
+current_step = shown_step()
 
-html_vis = render_visual(text, pattern, current_step, st.session_state.found_indices)
-st.markdown(html_vis, unsafe_allow_html=True)
+browser_ready = browser_mode and st.session_state.started and st.session_state.future is None
+if browser_ready:
+    # All steps are shipped once; Next Step is handled by the component itself
+    if st.session_state.player_html is None:
+        st.session_state.player_html = render_initial_skeleton(text, pattern, list(st.session_state.gen))
+    components.html(st.session_state.player_html, height=320, scrolling=True)
+else:
+    html_vis = render_visual(st.session_state.text, st.session_state.text_escaped,
+                             st.session_state.pattern_escaped, current_step, st.session_state.found_indices)
+    st.markdown(html_vis, unsafe_allow_html=True)
 
 # Status + completion
 if not st.session_state.started:
     st.info("Enter text and pattern, then press **Start Search**.")
-else:
-    st.caption(status_text(current_step, st.session_state.found_indices, len(pattern)))
+elif not browser_ready:
+    if st.session_state.future is not None:
+        st.caption("Preparing steps...")
+    else:
+        st.caption(status_text(current_step, st.session_state.found_indices, len(pattern)))
 
     # When finished, mirror Tkinter's summary
-    if st.session_state.step_idx is not None and st.session_state.step_idx >= (len(st.session_state.steps) - 1):
-        if not st.session_state.complete:
-            # user just arrived at last step; allow one more click to set complete
-            pass
+    # (the click after the last step exhausts the generator and sets complete)
+    if st.session_state.complete:
+        if st.session_state.found_indices:
+            st.success(f"Search complete. Pattern found at indices: {st.session_state.found_indices}")
         else:
-            if st.session_state.found_indices:
-                st.success(f"Search complete. Pattern found at indices: {st.session_state.found_indices}")
-            else:
-                st.warning("Search complete. Pattern not found.")
-            st.caption("Press **Reset** to start again.")
+            st.warning("Search complete. Pattern not found.")
+        st.caption("Press **Reset** to start again.")
 
 # Legend (matches your Tk colors)
 with st.expander("Legend", expanded=False):
-    st.markdown(
-        """
-        <div class="legend">
-          <span><i class="dot dot-default"></i> Default</span>
-          <span><i class="dot dot-compare"></i> Comparing</span>
-          <span><i class="dot dot-mismatch"></i> Mismatch</span>
-          <span><i class="dot dot-match"></i> Current Full Match</span>
-          <span><i class="dot dot-found"></i> Previously Found</span>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    st.markdown(LEGEND_HTML, unsafe_allow_html=True)
+
+# Keep polling the background step preparation; the rerun after it finishes enables Next Step
+if st.session_state.future is not None:
+    poll_steps(timeout=0.05)
+    st.rerun()